@@ -8,7 +8,9 @@ import matplotlib.pyplot as plt
 
 
 # === Function to generate monotonic grid ===
-def generate_monotonic_grid(volume_bins, growth_bins):
+rng = np.random.default_rng()
+
+def generate_monotonic_grid(volume_bins, growth_bins, rng=rng):
     num_volumes = len(volume_bins)
     num_growths = len(growth_bins)
     grid = np.zeros((num_volumes, num_growths))
@@ -16,22 +18,22 @@ def generate_monotonic_grid(volume_bins, growth_bins):
     min_rate = 0.01
     max_rate = 0.15
     
-    for i in range(num_volumes):
-        for j in range(num_growths):
-            if growth_bins[j][1] <= 0.08:  # No rebate tier
-                grid[i, j] = 0.00
-            else:
-                if i == 0 and j == 1:
-                    rate = min_rate  # Lowest non-zero rebate
-                else:
-                    prev_vol_rate = grid[i-1, j] if i > 0 else min_rate
-                    prev_growth_rate = grid[i, j-1] if j > 0 else min_rate
-                    base_rate = max(prev_vol_rate, prev_growth_rate)
-                    rate = min(base_rate + np.random.uniform(0.01, 0.03), max_rate)
-                    if j == num_growths - 1:
-                        # Ensure last growth tier > previous growth tier
-                        rate = min(max(grid[i, j-1] + 0.01, rate), max_rate)
-                grid[i, j] = round(rate, 2)
+    # Growth tiers at or below 8% pay nothing; the paid tiers form a block on the right
+    paid = np.array([g[1] > 0.08 for g in growth_bins])
+    num_paid = int(paid.sum())
+    if num_paid:
+        increments = rng.uniform(0.01, 0.03, size=(num_volumes, num_paid))
+        increments[0, 0] = 0.0  # Lowest non-zero rebate stays at min_rate
+        
+        # Each cell is max(cell above, cell to the left) + its increment. Along a row
+        # that is cumsum(increments) + running max of (above - cumsum + increment),
+        # so only the volume axis needs a Python loop.
+        row = np.full(num_paid, min_rate)
+        for i in range(num_volumes):
+            steps = np.cumsum(increments[i])
+            row = steps + np.maximum.accumulate(row - steps + increments[i])
+            grid[i, paid] = row
+        grid = np.round(np.minimum(grid, max_rate), 2)
     
     df_grid = pd.DataFrame(
         grid,
@@ -42,20 +44,23 @@ def generate_monotonic_grid(volume_bins, growth_bins):
     return df_grid
 
 # === Assign tiers ===
-def assign_tiers_from_bins(df, volume_bins, growth_bins):
-    v_edges = [b[0] for b in volume_bins] + [volume_bins[-1][1]]
-    g_edges = [g[0] for g in growth_bins] + [growth_bins[-1][1]]
-    v_labels = [f"V{i+1}" for i in range(len(volume_bins))]
-    g_labels = [f"G{i+1}" for i in range(len(growth_bins))]
-    df = df.copy()
-    df["growth"] = (df["curryr_rev"] - df["prevyr_rev"]) / df["prevyr_rev"]
-    df["volume_tier"] = pd.cut(df["curryr_rev"], bins=v_edges, labels=v_labels, right=True)
-    df["growth_tier"] = pd.cut(df["growth"], bins=g_edges, labels=g_labels, right=False)
-    return df
+def bin_codes(values, edges, right):
+    # Same intervals as pd.cut ((lo, hi] if right else [lo, hi)) as integer codes, -1 outside
+    codes = np.searchsorted(edges, values, side="left" if right else "right") - 1
+    return np.where(codes < len(edges) - 1, codes, -1)
+
+def compute_tier_codes(curr_rev, prev_rev, volume_bins, growth_bins):
+    # Integer (volume, growth) tier codes straight from the revenue arrays, -1 outside the bins
+    v_edges = np.array([b[0] for b in volume_bins] + [volume_bins[-1][1]], dtype=np.float64)
+    g_edges = np.array([g[0] for g in growth_bins] + [growth_bins[-1][1]], dtype=np.float64)
+    growth = (curr_rev - prev_rev) / prev_rev
+    return bin_codes(curr_rev, v_edges, right=True), bin_codes(growth, g_edges, right=False)
 
-# === Compute rebate ===
-def compute_rebate(row, rebate_rates):
-    return rebate_rates.get((row["volume_tier"], row["growth_tier"]), 0) * row["curryr_rev"]
+def cell_revenue(v_codes, g_codes, curr_rev, shape):
+    # Revenue per (volume, growth) cell; rows outside the bins earn no rebate
+    valid = (v_codes >= 0) & (g_codes >= 0)
+    flat = v_codes[valid] * shape[1] + g_codes[valid]
+    return np.bincount(flat, weights=curr_rev[valid], minlength=shape[0] * shape[1]).reshape(shape)
 
 
 
@@ -88,8 +93,21 @@ overall_best_config = None
 os.makedirs("grids", exist_ok=True)
 data_file = r"DummyDataGpot2.csv"
 
-# Load base data
-df_base = pd.read_csv(data_file).rename(columns=str.lower)
+cache_file = os.path.splitext(data_file)[0] + ".revenue.npy"
+
+# Load base data (only the two revenue columns are used). The CSV is parsed once
+# into a binary (2, N) cache that later runs memory-map; a newer CSV rebuilds it
+if not os.path.exists(cache_file) or os.path.getmtime(cache_file) < os.path.getmtime(data_file):
+    df_base = pd.read_csv(
+        data_file,
+        usecols=lambda c: c.lower() in ("curryr_rev", "prevyr_rev"),
+        dtype=np.float64,
+    ).rename(columns=str.lower)
+    np.save(cache_file, df_base[["curryr_rev", "prevyr_rev"]].to_numpy(dtype=np.float64).T)
+
+# Only these columns feed the search; each row of the cache is a contiguous array
+curryr_rev, prevyr_rev = np.load(cache_file, mmap_mode="r")
+total_revenue = curryr_rev.sum()
 
 # %%
 
@@ -99,30 +117,23 @@ for config_index, config in enumerate(bin_configs, start=1):
     volume_bins = config["volume_bins"]
     growth_bins = config["growth_bins"]
     
-    revenues = []
-    best_net_revenue = -np.inf
-    best_grid_df = None
-    best_iter = None
+    # Tiers depend only on the bins, so assign them once per config
+    v_codes, g_codes = compute_tier_codes(curryr_rev, prevyr_rev, volume_bins, growth_bins)
+    # Rebate = sum over cells of rate x cell revenue, so each iteration is O(V x G)
+    cell_rev = cell_revenue(v_codes, g_codes, curryr_rev, (len(volume_bins), len(growth_bins)))
     
-    for iteration in range(1, num_iterations + 1):
-        grid_df = generate_monotonic_grid(volume_bins, growth_bins)
-        grid_path = f"grids/config{config_index}_grid_{iteration}.csv"
-        grid_df.to_csv(grid_path, index=False)
-        
-        volume_labels = [f"V{i+1}" for i in range(len(volume_bins))]
-        growth_labels = [f"G{i+1}" for i in range(len(growth_bins))]
-        rebate_rates = {(v, g): float(grid_df.iloc[i, j+1]) for i, v in enumerate(volume_labels) for j, g in enumerate(growth_labels)}
-        
-        df = assign_tiers_from_bins(df_base, volume_bins, growth_bins)
-        df["rebate"] = df.apply(lambda row: compute_rebate(row, rebate_rates), axis=1)
-        
-        net_revenue = df["curryr_rev"].sum() - df["rebate"].sum()
-        revenues.append(net_revenue)
-        
-        if net_revenue > best_net_revenue:
-            best_net_revenue = net_revenue
-            best_grid_df = grid_df.copy()
-            best_iter = iteration
+    # Iterations are independent: draw every candidate grid, then score them all in one contraction
+    grid_dfs = [generate_monotonic_grid(volume_bins, growth_bins) for _ in range(num_iterations)]
+    rate_stack = np.stack([grid_df.iloc[:, 1:].to_numpy(dtype=np.float64) for grid_df in grid_dfs])
+    revenues = total_revenue - np.tensordot(rate_stack, cell_rev, axes=2)
+    
+    best_idx = int(np.argmax(revenues))
+    best_net_revenue = revenues[best_idx]
+    best_grid_df = grid_dfs[best_idx]
+    best_iter = best_idx + 1
+    
+    # Only the winning grid per config is kept on disk
+    best_grid_df.to_csv(f"grids/config{config_index}_best.csv", index=False)
     
     # Plot for this config
     plt.figure(figsize=(8, 5))
@@ -1,9 +1,7 @@
 import pandas as pd
 import numpy as np
 from scipy.optimize import minimize, LinearConstraint
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.pipeline import make_pipeline
+from scipy.sparse import csr_matrix
 
 class MLRebateOptimizer:
     def __init__(self, data_path):
@@ -13,8 +11,8 @@ class MLRebateOptimizer:
         self.data_path = data_path
         self.df_base = pd.read_csv(data_path).rename(columns=str.lower)
         
-        # Train ML Model
-        self.model = self._train_model()
+        # Train ML Model: Growth = Alpha + Beta * Rebate, evaluated inline by the objective
+        self._alpha, self._beta = self._train_model()
         
         self.volume_bins = None
         self.growth_bins = None
@@ -73,38 +71,35 @@ class MLRebateOptimizer:
 
     def _train_model(self):
         """
-        Train a Linear Regression model to predict Growth based on Rebate Rate.
-        We use a simple model: Growth ~ Rebate Rate
+        Fit a linear model predicting Growth from Rebate Rate.
+        We use a simple model: Growth ~ Rebate Rate, returned as (Alpha, Beta).
         """
         # Prepare training data
         # We assume the input CSV has historical 'rebate_rate' and resulting 'growth'
         # If 'growth' isn't there, we calculate it
-        df = self.df_base.copy()
+        df = self.df_base
         
-        # Ensure numeric
-        df['curryr_rev'] = pd.to_numeric(df['curryr_rev'], errors='coerce').fillna(0)
-        df['prevyr_rev'] = pd.to_numeric(df['prevyr_rev'], errors='coerce').fillna(0)
-        df['rebate_rate'] = pd.to_numeric(df['rebate_rate'], errors='coerce').fillna(0)
+        # Ensure numeric (missing/non-numeric -> 0) as plain float arrays
+        curr = pd.to_numeric(df['curryr_rev'], errors='coerce').to_numpy(dtype=np.float64, na_value=0.0)
+        prev = pd.to_numeric(df['prevyr_rev'], errors='coerce').to_numpy(dtype=np.float64, na_value=0.0)
+        rebate_rate = pd.to_numeric(df['rebate_rate'], errors='coerce').to_numpy(dtype=np.float64, na_value=0.0)
         
-        # Calculate growth
-        df['growth'] = (df['curryr_rev'] - df['prevyr_rev']) / df['prevyr_rev']
-        df.replace([np.inf, -np.inf], 0, inplace=True)
-        df['growth'] = df['growth'].fillna(0)
+        # Calculate growth in one pass; zero prior-year revenue counts as 0 growth
+        growth = np.where(prev != 0, (curr - prev) / np.where(prev == 0, 1.0, prev), 0.0)
         
         # Filter outliers for better training
-        df = df[(df['growth'] > -0.5) & (df['growth'] < 0.5)]
+        m = (growth > -0.5) & (growth < 0.5) & np.isfinite(growth)
         
-        X = df[['rebate_rate']]
-        y = df['growth']
+        x = rebate_rate[m]
+        y = growth[m]
         
         # We force the intercept to be the average organic growth (when rebate is 0)
         # But for simplicity, we'll let the model learn it.
-        # We use a simple Linear Regression: Growth = Alpha + Beta * Rebate
-        model = LinearRegression()
-        model.fit(X, y)
+        # Simple least-squares line: Growth = Alpha + Beta * Rebate
+        beta, alpha = np.polyfit(x, y, 1)
         
-        print(f"ML Model Trained. Coefficient (Elasticity Proxy): {model.coef_[0]:.4f}, Intercept: {model.intercept_:.4f}")
-        return model
+        print(f"ML Model Trained. Coefficient (Elasticity Proxy): {beta:.4f}, Intercept: {alpha:.4f}")
+        return float(alpha), float(beta)
 
     def set_bins(self, volume_bins, growth_bins):
         """
@@ -121,41 +116,43 @@ class MLRebateOptimizer:
         self.df_processed = self.df_base.copy()
         self.df_processed["growth_val"] = (self.df_processed["curryr_rev"] - self.df_processed["prevyr_rev"]) / self.df_processed["prevyr_rev"]
         
-        self.df_processed["v_idx"] = pd.cut(self.df_processed["curryr_rev"], bins=v_edges, right=True).cat.codes
-        self.df_processed["g_idx"] = pd.cut(self.df_processed["growth_val"], bins=g_edges, right=False).cat.codes
+        # Same intervals as pd.cut ((lo, hi] volume, [lo, hi) growth) without the Categorical
+        self.df_processed["v_idx"] = np.searchsorted(v_edges, self.df_processed["curryr_rev"].to_numpy(), side="left") - 1
+        self.df_processed["g_idx"] = np.searchsorted(g_edges, self.df_processed["growth_val"].to_numpy(), side="right") - 1
         
         # Filter valid bins
-        self.df_processed = self.df_processed[(self.df_processed["v_idx"] >= 0) & (self.df_processed["g_idx"] >= 0)]
+        self.df_processed = self.df_processed[
+            (self.df_processed["v_idx"] >= 0) & (self.df_processed["v_idx"] < len(volume_bins))
+            & (self.df_processed["g_idx"] >= 0) & (self.df_processed["g_idx"] < len(growth_bins))
+        ]
         
         # Pre-aggregate data: We need sum of prevyr_rev to project new revenue
         self.agg_data = self.df_processed.groupby(['v_idx', 'g_idx'])['prevyr_rev'].sum().reset_index()
+        
+        # Cache plain arrays so objective evaluations never touch pandas
+        self._v_idx = self.agg_data['v_idx'].to_numpy()
+        self._g_idx = self.agg_data['g_idx'].to_numpy()
+        self._base_rev = self.agg_data['prevyr_rev'].to_numpy(dtype=np.float64)
+        self._flat_idx = self._v_idx * len(growth_bins) + self._g_idx
 
     def objective_function(self, flat_rates):
         """
         Objective function to MINIMIZE (negative Net Revenue).
         
-        Uses the log-log model to predict growth with diminishing returns.
+        Uses the fitted linear model (Growth = Alpha + Beta * Rebate) to predict growth.
         """
         rows = len(self.volume_bins)
         cols = len(self.growth_bins)
         rates_grid = flat_rates.reshape((rows, cols))
         
         # Map rates to aggregated data
-        applied_rates = rates_grid[self.agg_data['v_idx'], self.agg_data['g_idx']]
-        
-        # Predict Growth using Log-Log ML Model
-        # Model was trained on: log(1+Growth) ~ log(1+Rebate)
-        # So we need to:
-        # 1. Transform input: log(1 + rebate_rate)
-        # 2. Get prediction: log(1 + predicted_growth)
-        # 3. Inverse transform: predicted_growth = exp(prediction) - 1
+        applied_rates = rates_grid[self._v_idx, self._g_idx]
         
-        X_pred = np.log1p(applied_rates).reshape(-1, 1)  # log(1 + rebate)
-        log_growth_pred = self.model.predict(X_pred)  # Returns log(1 + growth)
-        predicted_growth = np.expm1(log_growth_pred)  # expm1(x) = exp(x) - 1
+        # Predict growth with the same linear form the model was trained on
+        predicted_growth = self._alpha + self._beta * applied_rates
         
         # Project Revenue
-        base_revenue = self.agg_data['prevyr_rev']
+        base_revenue = self._base_rev
         projected_revenue = base_revenue * (1 + predicted_growth)
         
         # Calculate Costs
@@ -164,6 +161,17 @@ class MLRebateOptimizer:
         
         return -np.sum(net_revenue)
 
+    def _grad(self, flat_rates):
+        """
+        Analytic gradient of objective_function with respect to the flat rates.
+        """
+        applied_rates = flat_rates[self._flat_idx]
+        # d/dr of Base * (1 + Alpha + Beta*r) * (1 - r) = Base * (Beta*(1 - r) - (1 + Alpha + Beta*r))
+        per_cell = self._base_rev * (self._beta * (1 - applied_rates) - (1 + self._alpha + self._beta * applied_rates))
+        grad = np.zeros(flat_rates.shape[0])
+        np.add.at(grad, self._flat_idx, -per_cell)
+        return grad
+
     def get_constraints(self, min_increment=0.01):
         """
         Generate monotonicity constraints using LinearConstraint.
@@ -172,7 +180,7 @@ class MLRebateOptimizer:
         cols = len(self.growth_bins)
         num_vars = rows * cols
         
-        A_rows = []
+        rows_idx, cols_idx, data = [], [], []
         lb = []
         ub = []
         
@@ -184,10 +192,9 @@ class MLRebateOptimizer:
             for c in range(cols):
                 if self.growth_bins[c][1] <= 0.08: continue
                 
-                row = np.zeros(num_vars)
-                row[idx(r, c)] = 1
-                row[idx(r-1, c)] = -1
-                A_rows.append(row)
+                rows_idx += [len(lb), len(lb)]
+                cols_idx += [idx(r, c), idx(r-1, c)]
+                data += [1.0, -1.0]
                 lb.append(min_increment)
                 ub.append(np.inf)
                 
@@ -197,15 +204,15 @@ class MLRebateOptimizer:
                 if self.growth_bins[c][1] <= 0.08: continue
                 if self.growth_bins[c-1][1] <= 0.08: continue
                 
-                row = np.zeros(num_vars)
-                row[idx(r, c)] = 1
-                row[idx(r, c-1)] = -1
-                A_rows.append(row)
+                rows_idx += [len(lb), len(lb)]
+                cols_idx += [idx(r, c), idx(r, c-1)]
+                data += [1.0, -1.0]
                 lb.append(min_increment)
                 ub.append(np.inf)
                 
-        if not A_rows: return None
-        return LinearConstraint(A_rows, lb, ub)
+        if not lb: return None
+        A = csr_matrix((data, (rows_idx, cols_idx)), shape=(len(lb), num_vars))
+        return LinearConstraint(A, lb, ub)
 
     def optimize(self):
         """
@@ -232,14 +239,36 @@ class MLRebateOptimizer:
         
         print(f"Starting ML-based optimization...")
         
+        # Smooth objective with linear constraints: SLSQP converges in a handful of
+        # iterations; trust-constr is kept as a fallback if it does not.
+        # SLSQP's tolerance is absolute, so it works on the objective scaled to ~1.
+        scale = float(np.abs(self._base_rev).sum()) or 1.0
         result = minimize(
-            self.objective_function,
+            lambda x: self.objective_function(x) / scale,
             initial_guess,
-            method='trust-constr',
+            method='SLSQP',
+            jac=lambda x: self._grad(x) / scale,
             bounds=bounds,
             constraints=constraints_arg,
-            options={'verbose': 1, 'maxiter': 10000}
+            options={'maxiter': 1000}
         )
+        result.fun *= scale
+        
+        if not result.success:
+            print("SLSQP did not converge:", result.message, "- retrying with trust-constr")
+            # trust-constr converges far faster here with its dense QR projection than
+            # with the sparse augmented system, and the grid-sized A is small
+            if cons:
+                constraints_arg = [LinearConstraint(cons.A.toarray(), cons.lb, cons.ub)]
+            result = minimize(
+                self.objective_function,
+                initial_guess,
+                method='trust-constr',
+                jac=self._grad,
+                bounds=bounds,
+                constraints=constraints_arg,
+                options={'verbose': 1, 'maxiter': 10000}
+            )
         
         if result.success:
             best_grid = result.x.reshape((rows, cols))
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import os
 from scipy.optimize import minimize, LinearConstraint
+from scipy.sparse import csr_matrix
 
 class RebateOptimizer:
     def __init__(self, data_path, elasticity=0.5):
@@ -36,16 +37,26 @@ class RebateOptimizer:
         self.df_processed = self.df_base.copy()
         self.df_processed["growth_val"] = (self.df_processed["curryr_rev"] - self.df_processed["prevyr_rev"]) / self.df_processed["prevyr_rev"]
         
-        # pd.cut returns categorical, .cat.codes gives integer indices (-1 for NaN/out of bounds)
-        self.df_processed["v_idx"] = pd.cut(self.df_processed["curryr_rev"], bins=v_edges, right=True).cat.codes
-        self.df_processed["g_idx"] = pd.cut(self.df_processed["growth_val"], bins=g_edges, right=False).cat.codes
+        # searchsorted on the edges gives the same intervals as pd.cut as plain integer
+        # indices: (lo, hi] for volume, [lo, hi) for growth; NaN lands past the last bin
+        self.df_processed["v_idx"] = np.searchsorted(v_edges, self.df_processed["curryr_rev"].to_numpy(), side="left") - 1
+        self.df_processed["g_idx"] = np.searchsorted(g_edges, self.df_processed["growth_val"].to_numpy(), side="right") - 1
         
-        # Filter out rows that didn't fall into any bin (code -1)
-        self.df_processed = self.df_processed[(self.df_processed["v_idx"] >= 0) & (self.df_processed["g_idx"] >= 0)]
+        # Filter out rows that didn't fall into any bin
+        self.df_processed = self.df_processed[
+            (self.df_processed["v_idx"] >= 0) & (self.df_processed["v_idx"] < len(volume_bins))
+            & (self.df_processed["g_idx"] >= 0) & (self.df_processed["g_idx"] < len(growth_bins))
+        ]
         
         # Pre-aggregate data for faster optimization
         # We only need the sum of revenue for each (v_idx, g_idx) bucket
         self.agg_data = self.df_processed.groupby(['v_idx', 'g_idx'])['curryr_rev'].sum().reset_index()
+        
+        # Cache plain arrays so objective evaluations never touch pandas
+        self._v_idx = self.agg_data['v_idx'].to_numpy()
+        self._g_idx = self.agg_data['g_idx'].to_numpy()
+        self._base_rev = self.agg_data['curryr_rev'].to_numpy(dtype=np.float64)
+        self._flat_idx = self._v_idx * len(growth_bins) + self._g_idx
 
     def objective_function(self, flat_rates):
         """
@@ -61,10 +72,10 @@ class RebateOptimizer:
         
         # Map rates to the aggregated data
         # We can use numpy indexing since v_idx and g_idx are integers
-        applied_rates = rates_grid[self.agg_data['v_idx'], self.agg_data['g_idx']]
+        applied_rates = rates_grid[self._v_idx, self._g_idx]
         
         # Calculate Metrics
-        base_revenue = self.agg_data['curryr_rev']
+        base_revenue = self._base_rev
         
         # Elasticity Model: New Rev = Base * (1 + Elasticity * Rate)
         projected_revenue = base_revenue * (1 + self.elasticity * applied_rates)
@@ -78,6 +89,17 @@ class RebateOptimizer:
         # Return negative sum for minimization
         return -np.sum(net_revenue)
 
+    def _grad(self, flat_rates):
+        """
+        Analytic gradient of objective_function with respect to the flat rates.
+        """
+        applied_rates = flat_rates[self._flat_idx]
+        # d/dr of Base * (1 + e*r) * (1 - r) = Base * (e - 2*e*r - 1)
+        per_cell = self._base_rev * (self.elasticity - 2 * self.elasticity * applied_rates - 1)
+        grad = np.zeros(flat_rates.shape[0])
+        np.add.at(grad, self._flat_idx, -per_cell)
+        return grad
+
     def get_constraints(self, min_increment=0.01):
         """
         Generate monotonicity constraints using LinearConstraint.
@@ -88,8 +110,9 @@ class RebateOptimizer:
         num_vars = rows * cols
         
         # We need to build A matrix and lb vector
-        # Each constraint is a row in A
-        A_rows = []
+        # Each constraint is a row in A with exactly two nonzeros, so collect
+        # them as (row, col, value) triplets for a sparse matrix
+        rows_idx, cols_idx, data = [], [], []
         lb = []
         ub = [] # Upper bound for constraint (infinity)
         
@@ -105,10 +128,9 @@ class RebateOptimizer:
                 
                 # rate[r,c] - rate[r-1,c] >= min_increment
                 # 1 * x[curr] + (-1) * x[prev] >= min_increment
-                row = np.zeros(num_vars)
-                row[idx(r, c)] = 1
-                row[idx(r-1, c)] = -1
-                A_rows.append(row)
+                rows_idx += [len(lb), len(lb)]
+                cols_idx += [idx(r, c), idx(r-1, c)]
+                data += [1.0, -1.0]
                 lb.append(min_increment)
                 ub.append(np.inf)
                 
@@ -123,17 +145,17 @@ class RebateOptimizer:
                     continue
                 
                 # rate[r,c] - rate[r,c-1] >= min_increment
-                row = np.zeros(num_vars)
-                row[idx(r, c)] = 1
-                row[idx(r, c-1)] = -1
-                A_rows.append(row)
+                rows_idx += [len(lb), len(lb)]
+                cols_idx += [idx(r, c), idx(r, c-1)]
+                data += [1.0, -1.0]
                 lb.append(min_increment)
                 ub.append(np.inf)
                 
-        if not A_rows:
+        if not lb:
             return None
             
-        return LinearConstraint(A_rows, lb, ub)
+        A = csr_matrix((data, (rows_idx, cols_idx)), shape=(len(lb), num_vars))
+        return LinearConstraint(A, lb, ub)
 
     def optimize(self):
         """
@@ -168,14 +190,36 @@ class RebateOptimizer:
         print(f"Starting optimization for {rows}x{cols} grid...")
         print("Constraints: Min Increment 1%, Max 15%, 0% for Growth <= 8%")
         
+        # Smooth objective with linear constraints: SLSQP converges in a handful of
+        # iterations; trust-constr is kept as a fallback if it does not.
+        # SLSQP's tolerance is absolute, so it works on the objective scaled to ~1.
+        scale = float(np.abs(self._base_rev).sum()) or 1.0
         result = minimize(
-            self.objective_function,
+            lambda x: self.objective_function(x) / scale,
             initial_guess,
-            method='trust-constr',
+            method='SLSQP',
+            jac=lambda x: self._grad(x) / scale,
             bounds=bounds,
             constraints=constraints_arg,
-            options={'verbose': 1, 'maxiter': 1000}
+            options={'maxiter': 1000}
         )
+        result.fun *= scale
+        
+        if not result.success:
+            print("SLSQP did not converge:", result.message, "- retrying with trust-constr")
+            # trust-constr converges far faster here with its dense QR projection than
+            # with the sparse augmented system, and the grid-sized A is small
+            if cons:
+                constraints_arg = [LinearConstraint(cons.A.toarray(), cons.lb, cons.ub)]
+            result = minimize(
+                self.objective_function,
+                initial_guess,
+                method='trust-constr',
+                jac=self._grad,
+                bounds=bounds,
+                constraints=constraints_arg,
+                options={'verbose': 1, 'maxiter': 1000}
+            )
         
         if result.success:
             print("Optimization Successful!")
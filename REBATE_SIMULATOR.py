@@ -3,6 +3,8 @@ import pandas as pd
 import numpy as np
 import re
 
+_VOLUME_NUM_PAT = re.compile(r'(\d+)')
+
 st.set_page_config(page_title="Rebate Program Simulator", layout="wide")
 st.title("📊 Rebate Program Simulator (CSV Grid Upload)")
 
@@ -13,6 +15,33 @@ Upload a CSV defining your rebate program grid:
 - **Cells** = Rebate rates (fractions or percentages)
 """)
 
+
+# Grid parsing and tier codes only change when their inputs do, so reruns reuse them
+@st.cache_data(show_spinner=False)
+def parse_grid(grid_df):
+    # Extract volume bins from first column: "lower+" uses the first number,
+    # anything else must hold exactly two ("lower-upper", "lower - upper")
+    labels = grid_df.iloc[:, 0].astype(str)
+    plus_mask = labels.str.contains('+', regex=False).to_numpy()
+    n_nums = labels.str.count(_VOLUME_NUM_PAT).to_numpy()
+    bad = ~np.where(plus_mask, n_nums >= 1, n_nums == 2)
+    if bad.any():
+        raise ValueError(f"Unrecognised volume bin label(s): {', '.join(labels[bad])}")
+    nums = (labels.str.extractall(_VOLUME_NUM_PAT)[0].astype(float).unstack()
+            .reindex(index=labels.index, columns=[0, 1]))
+    lower = nums[0].to_numpy()
+    upper = np.where(plus_mask, np.inf, nums[1].to_numpy())
+    volume_bins = list(zip(lower.tolist(), upper.tolist()))
+
+    # Extract growth bins from column headers
+    growth_bins = [float(x) for x in grid_df.columns[1:]]
+    growth_bins.append(np.inf)
+
+    # Build rate matrix (volume tiers x growth tiers)
+    rate_mat = grid_df.iloc[:len(volume_bins), 1:len(growth_bins)].to_numpy(dtype=np.float64)
+    return volume_bins, growth_bins, rate_mat
+
+
 # --- 1. Upload CSV for grid ---
 grid_file = st.file_uploader("Upload Rebate Grid CSV", type=["csv"])
 if grid_file:
@@ -21,29 +50,11 @@ if grid_file:
     grid_df = st.data_editor(grid_df, num_rows="dynamic", use_container_width=True)
 
     # --- 2. Parse bins and rates ---
-    # Extract volume bins from first column
-    volume_bins = []
-    for row in grid_df.iloc[:, 0]:
-        if "+" in str(row):
-            lower = float(re.findall(r'\d+', str(row))[0])
-            volume_bins.append((lower, np.inf))
-        else:
-            nums = re.findall(r'\d+', str(row))
-            lower, upper = map(float, nums)
-            volume_bins.append((lower, upper))
-
-    # Extract growth bins from column headers
-    growth_bins = [float(x) for x in grid_df.columns[1:]]
-    growth_bins.append(np.inf)
-
-    # Build rate dictionary
-    volume_labels = [f"V{i+1}" for i in range(len(volume_bins))]
-    growth_labels = [f"G{i+1}" for i in range(len(growth_bins)-1)]
-
-    rebate_rates = {}
-    for i, v_label in enumerate(volume_labels):
-        for j, g_label in enumerate(growth_labels):
-            rebate_rates[(v_label, g_label)] = float(grid_df.iloc[i, j+1])
+    try:
+        volume_bins, growth_bins, rate_mat = parse_grid(grid_df)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
 
 else:
     st.warning("Upload a CSV to get started.")
@@ -51,34 +62,47 @@ else:
 
 
 
-# --- 4. Assign tiers dynamically ---
-def assign_tiers_from_bins(df, volume_bins, growth_bins):
-    v_edges = [b[0] for b in volume_bins] + [volume_bins[-1][1]]  # Build numeric edges
-    v_labels = [f"V{i+1}" for i in range(len(volume_bins))]
-    g_labels = [f"G{i+1}" for i in range(len(growth_bins)-1)]
+# --- Tier assignment helpers ---
+def bin_codes(values, edges, right):
+    # Same intervals as pd.cut ((lo, hi] if right else [lo, hi)) as integer codes, -1 outside
+    codes = np.searchsorted(edges, values, side="left" if right else "right") - 1
+    return np.where(codes < len(edges) - 1, codes, -1)
 
-    df = df.copy()
-    df["growth"] = (df["curryr_rev"] - df["prevyr_rev"]) / df["prevyr_rev"]
-    # 3. Assign tiers using curryr_rev for volume and calculated growth for growth
-    df["volume_tier"] = pd.cut(df["curryr_rev"], bins=v_edges, labels=v_labels, right=True)
-    df["growth_tier"] = pd.cut(df["growth"], bins=growth_bins, labels=g_labels, right=False)
-    # 4. Optionally keep rfp_group and rfp_name for downstream grouping
-    df = df[["rfp_group", "rfp_name", "curryr_rev", "prevyr_rev", "growth", "volume_tier", "growth_tier"]]
-    return df
+
+@st.cache_data(show_spinner=False)
+def compute_tier_codes(curr_rev, prev_rev, volume_bins, growth_bins):
+    v_edges = np.array([b[0] for b in volume_bins] + [volume_bins[-1][1]], dtype=np.float64)  # Build numeric edges
+    g_edges = np.asarray(growth_bins, dtype=np.float64)
+    # Assign tiers using curryr_rev for volume and calculated growth for growth, -1 outside the bins
+    growth = (curr_rev - prev_rev) / prev_rev
+    return bin_codes(curr_rev, v_edges, right=True), bin_codes(growth, g_edges, right=False)
 
 
 # --- 3. Upload / sample account data ---
 st.header("📥 Upload Account Data")
 account_file = st.file_uploader("Upload Accounts CSV (account, volume, growth)", type=["csv"])
 if account_file:
-    df = pd.read_csv(account_file).rename(columns=str.lower)
-    df = assign_tiers_from_bins(df, volume_bins, growth_bins)
+    # Parse only the columns the simulator uses; headers are matched case-insensitively
+    df = pd.read_csv(
+        account_file,
+        usecols=lambda c: c.lower() in ("rfp_group", "rfp_name", "curryr_rev", "prevyr_rev"),
+    ).rename(columns=str.lower)
+    df = df.astype({"curryr_rev": "float64", "prevyr_rev": "float64"})
+    curr_rev = df["curryr_rev"].to_numpy()
+    prev_rev = df["prevyr_rev"].to_numpy()
+
+    # --- 4. Assign tiers ---
+    # Tier codes are computed once from the revenue arrays; labels are attached for display
+    v, g = compute_tier_codes(curr_rev, prev_rev, volume_bins, growth_bins)
+    df["growth"] = (curr_rev - prev_rev) / prev_rev
+    df["volume_tier"] = pd.Categorical.from_codes(v, categories=[f"V{i+1}" for i in range(len(volume_bins))])
+    df["growth_tier"] = pd.Categorical.from_codes(g, categories=[f"G{i+1}" for i in range(len(growth_bins) - 1)])
 
     # --- 5. Compute rebates ---
-    def compute_rebate(row):
-        return rebate_rates.get((row["volume_tier"], row["growth_tier"]), 0) * row["volume"]
-
-    df["rebate"] = df.apply(compute_rebate, axis=1)
+    # Gather each account's rate by tier codes; accounts outside the bins earn 0
+    valid = (v >= 0) & (g >= 0)
+    rates = np.where(valid, rate_mat[np.where(valid, v, 0), np.where(valid, g, 0)], 0.0)
+    df["rebate"] = rates * curr_rev
 
     # --- 6. Show results ---
     st.subheader("💰 Calculated Rebates")
@@ -87,7 +111,8 @@ if account_file:
     total_rebate = df["rebate"].sum()
     st.metric("Total Program Cost", f"${total_rebate:,.2f}")
 
-    summary = df.groupby(["volume_tier", "growth_tier"])["rebate"].agg(["count","sum"]).reset_index()
+    # Only tier combinations that actually hold accounts are summarized
+    summary = df.groupby(["volume_tier", "growth_tier"], observed=True)["rebate"].agg(count="count", sum="sum").reset_index()
     st.subheader("📊 Tier Summary")
     st.dataframe(summary, use_container_width=True)
 else:
@@ -1,34 +1,47 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import pandas as pd
 import numpy as np
+import orjson
+import json
+import queue
 import re
 import io
+import threading
+import time
 
 app = Flask(__name__)
+# Coalesce near-simultaneous /calculate requests that share a grid into one pipeline run.
+# Only pays off under concurrent load, so it is off by default.
+app.config.setdefault("CALCULATE_BATCHING", False)
+app.config.setdefault("CALCULATE_BATCH_WINDOW", 0.01)  # seconds
+
+# Numbers in grid bin labels, e.g. "9000-22499" or "45000+"
+_NUM_RE = re.compile(r'(\d+\.?\d*)')
 
 # --- Helper Functions from original script ---
 
 def parse_grid(grid_data):
-    """Parses the grid data to extract bins and rates, ignoring errors."""
+    """Parses the grid data to extract bin edges and rates, ignoring errors.
+
+    Returns (v_edges, growth_edges, rate_matrix): volume edges are the bin lower
+    bounds plus the last upper bound, growth edges end in inf.
+    """
     if not grid_data or len(grid_data) < 2:
-        return [], [], {}
+        return np.empty(0), np.empty(0), np.zeros((0, 0))
 
     grid_df = pd.DataFrame(grid_data[1:], columns=grid_data[0])
 
-    # Extract volume bins from first column
-    volume_bins = []
-    for row in grid_df.iloc[:, 0]:
-        try:
-            if "+" in str(row):
-                lower = float(re.findall(r'\d+\.?\d*', str(row))[0])
-                volume_bins.append((lower, np.inf))
-            else:
-                nums = re.findall(r'\d+\.?\d*', str(row))
-                if len(nums) == 2:
-                    lower, upper = map(float, nums)
-                    volume_bins.append((lower, upper))
-        except (ValueError, IndexError):
-            continue # Ignore rows that can't be parsed
+    # Extract volume bins from first column: "lower+" needs one number, "lower-upper" two;
+    # rows that don't fit either are ignored
+    labels = grid_df.iloc[:, 0].astype(str)
+    plus_mask = labels.str.contains('+', regex=False).to_numpy()
+    n_nums = labels.str.count(_NUM_RE).to_numpy()
+    nums = (labels.str.extractall(_NUM_RE)[0].astype(float).unstack()
+            .reindex(index=labels.index, columns=[0, 1]))
+    keep = np.where(plus_mask, n_nums >= 1, n_nums == 2)
+    lower = nums[0].to_numpy()[keep]
+    upper = np.where(plus_mask, np.inf, nums[1].to_numpy())[keep]
+    v_edges = np.append(lower, upper[-1:])
 
     # Extract growth bins from column headers
     growth_bins = []
@@ -39,14 +52,12 @@ def parse_grid(grid_data):
             continue # Ignore columns that can't be parsed
     growth_bins.sort()
     growth_bins.append(np.inf)
+    growth_edges = np.asarray(growth_bins, dtype=np.float64)
 
-    # Build rate dictionary
-    volume_labels = [f"V{i+1}" for i in range(len(volume_bins))]
-    growth_labels = [f"G{i+1}" for i in range(len(growth_bins)-1)]
-
-    rebate_rates = {}
-    for i, v_label in enumerate(volume_labels):
-        for j, g_label in enumerate(growth_labels):
+    # Build rate matrix (volume tiers x growth tiers), indexed by tier codes
+    rate_matrix = np.zeros((len(lower), len(growth_edges)-1), dtype=np.float64)
+    for i in range(rate_matrix.shape[0]):
+        for j in range(rate_matrix.shape[1]):
             rate_str = str(grid_df.iloc[i, j+1]).strip()
             try:
                 if '%' in rate_str:
@@ -57,38 +68,225 @@ def parse_grid(grid_data):
                         rate = rate_val / 100.0
                     else:
                         rate = rate_val
-                rebate_rates[(v_label, g_label)] = rate
+                rate_matrix[i, j] = rate
             except (ValueError, IndexError):
-                rebate_rates[(v_label, g_label)] = 0
+                rate_matrix[i, j] = 0
+
+    return v_edges, growth_edges, rate_matrix
 
-    return volume_bins, growth_bins, rebate_rates
+def bin_codes(values, edges):
+    """Integer bin codes for [lo, hi) intervals, -1 where pd.cut would give NaN."""
+    edges = np.asarray(edges, dtype=np.float64)
+    if np.any(np.diff(edges) <= 0):
+        raise ValueError("bins must increase monotonically.")
+    codes = np.searchsorted(edges, values, side="right") - 1
+    return np.where(codes < len(edges) - 1, codes, -1)
+
+def _to_float(value):
+    """float(value), or NaN for values that aren't numbers."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def accounts_frame(header, rows):
+    """Builds the accounts DataFrame with float64 revenue columns, converted once."""
+    df = pd.DataFrame(rows, columns=header)
+    for col in ("curryr_rev", "prevyr_rev"):
+        if col in header:  # a missing column is reported by assign_tiers_from_bins
+            i = header.index(col)
+            df[col] = np.fromiter(
+                (_to_float(row[i]) if i < len(row) else np.nan for row in rows),
+                dtype=np.float64, count=len(rows),
+            )
+    return df
 
-def assign_tiers_from_bins(df, volume_bins, growth_bins):
-    """Assigns volume and growth tiers to the account data."""
-    v_edges = [b[0] for b in volume_bins] + [volume_bins[-1][1]]
-    v_labels = [f"V{i+1}" for i in range(len(volume_bins))]
-    g_labels = [f"G{i+1}" for i in range(len(growth_bins)-1)]
+def assign_tiers_from_bins(df, v_edges, growth_edges):
+    """Assigns volume and growth tiers to the account data, adding the columns in place.
 
-    df = df.copy()
-    # Ensure revenue columns are numeric
-    df["curryr_rev"] = pd.to_numeric(df["curryr_rev"], errors='coerce')
-    df["prevyr_rev"] = pd.to_numeric(df["prevyr_rev"], errors='coerce')
+    Revenue columns must already be numeric (see accounts_frame); edges are the
+    float64 arrays returned by parse_grid.
+    """
+    v_labels = [f"V{i+1}" for i in range(len(v_edges)-1)]
+    g_labels = [f"G{i+1}" for i in range(len(growth_edges)-1)]
 
-    # Calculate growth, handle division by zero
-    df["growth"] = (df["curryr_rev"] - df["prevyr_rev"]) / df["prevyr_rev"]
-    df["growth"].replace([np.inf, -np.inf], 0, inplace=True) # Replace inf with 0
-    df["growth"].fillna(0, inplace=True) # Fill NaN with 0 for accounts with 0 prevyr_rev
+    # Calculate growth in one pass; accounts with 0 (or missing) prevyr_rev get 0 growth
+    curr = df["curryr_rev"].to_numpy()
+    prev = df["prevyr_rev"].to_numpy()
+    growth = np.zeros_like(curr)
+    valid = (prev != 0) & np.isfinite(curr) & np.isfinite(prev)
+    np.subtract(curr, prev, out=growth, where=valid)
+    np.divide(growth, prev, out=growth, where=valid)
+    df["growth"] = growth
 
-    df["volume_tier"] = pd.cut(df["curryr_rev"], bins=v_edges, labels=v_labels, right=False, include_lowest=True)
-    df["growth_tier"] = pd.cut(df["growth"], bins=growth_bins, labels=g_labels, right=False, include_lowest=True)
+    # Tier codes via searchsorted; labels are attached without building interval bins
+    v_codes = bin_codes(curr, v_edges)
+    g_codes = bin_codes(growth, growth_edges)
+    df["volume_tier"] = pd.Categorical.from_codes(v_codes, categories=v_labels)
+    df["growth_tier"] = pd.Categorical.from_codes(g_codes, categories=g_labels)
 
     return df
 
-def compute_rebate(row, rebate_rates):
-    """Computes the rebate for a single row."""
-    tier_tuple = (row["volume_tier"], row["growth_tier"])
-    rate = rebate_rates.get(tier_tuple, 0)
-    return rate * row["curryr_rev"]
+def score_accounts(accounts_df, v_edges, growth_edges, rate_matrix):
+    """Adds tier and rebate columns in place; returns the tier codes and the tiered-account mask."""
+    # Assign tiers
+    assign_tiers_from_bins(accounts_df, v_edges, growth_edges)
+
+    # Compute rebates: gather each account's rate by tier codes; untiered accounts earn 0
+    v_idx = accounts_df["volume_tier"].cat.codes.to_numpy()
+    g_idx = accounts_df["growth_tier"].cat.codes.to_numpy()
+    mask = (v_idx >= 0) & (g_idx >= 0)
+    rates = np.where(mask, rate_matrix[np.clip(v_idx, 0, None), np.clip(g_idx, 0, None)], 0.0)
+    accounts_df["rebate"] = np.multiply(rates, accounts_df["curryr_rev"].to_numpy(), out=rates)
+    return v_idx, g_idx, mask
+
+def summarize_rebates(accounts_df, v_idx, g_idx, mask, shape):
+    """Builds the aggregate /calculate response body for scored accounts."""
+    total_rebate = float(accounts_df["rebate"].sum())
+
+    # Per-tier count and rebate sum straight from the codes; only tiers with accounts are listed
+    n_v, n_g = shape
+    flat = v_idx[mask] * n_g + g_idx[mask]
+    counts = np.bincount(flat, minlength=n_v * n_g)
+    sums = np.bincount(flat, weights=accounts_df["rebate"].to_numpy()[mask], minlength=n_v * n_g)
+    summary = [
+        {"volume_tier": f"V{k // n_g + 1}", "growth_tier": f"G{k % n_g + 1}",
+         "count": int(counts[k]), "sum": float(sums[k])}
+        for k in np.flatnonzero(counts)
+    ]
+
+    return {
+        "total_rebate": total_rebate,
+        "summary": summary
+    }
+
+def stream_results(results, accounts_df, chunk_rows=2000):
+    """Yields results plus a "table" of per-account records as JSON, a chunk of rows at a time."""
+    yield orjson.dumps(results)[:-1] + b',"table":['
+    columns = [str(c) for c in accounts_df.columns]
+    for start in range(0, len(accounts_df), chunk_rows):
+        chunk = accounts_df.iloc[start:start + chunk_rows]
+        values = zip(*(chunk.iloc[:, j].tolist() for j in range(len(columns))))
+        rows = orjson.dumps([dict(zip(columns, row)) for row in values])
+        yield (b"," if start else b"") + rows[1:-1]
+    yield b"]}"
+
+def calculate_results(grid_data, accounts_data):
+    """Runs the full rebate pipeline for one request; returns the aggregates and the scored accounts."""
+    # Create DataFrame for accounts
+    accounts_df = accounts_frame(accounts_data[0], accounts_data[1:])
+
+    # Parse grid and get rates/bins
+    v_edges, growth_edges, rate_matrix = parse_grid(grid_data)
+
+    v_idx, g_idx, mask = score_accounts(accounts_df, v_edges, growth_edges, rate_matrix)
+    return summarize_rebates(accounts_df, v_idx, g_idx, mask, rate_matrix.shape), accounts_df
+
+class CalculateBatcher:
+    """Background worker that runs queued requests sharing a grid and account header as one batch."""
+
+    def __init__(self, window):
+        self.window = window
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def submit(self, grid_data, accounts_data):
+        with self.lock:
+            # (Re)start the worker lazily; a worker that died is replaced
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+        job = {"grid": grid_data, "accounts": accounts_data, "done": threading.Event()}
+        self.jobs.put(job)
+        job["done"].wait()
+        if "error" in job:
+            raise job["error"]
+        return job["result"]
+
+    def _run(self):
+        while True:
+            # Block for the first request, then collect whatever arrives within the window
+            jobs = [self.jobs.get()]
+            deadline = time.monotonic() + self.window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    jobs.append(self.jobs.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Every collected job is released, whatever goes wrong while grouping or running
+            try:
+                groups = {}
+                for job in jobs:
+                    key = (json.dumps(job["grid"]), tuple(job["accounts"][0]))
+                    groups.setdefault(key, []).append(job)
+                for group in groups.values():
+                    self._run_group(group)
+            except Exception as e:
+                for job in jobs:
+                    if not job["done"].is_set():
+                        job["error"] = e
+                        job["done"].set()
+
+    def _run_group(self, group):
+        try:
+            if len(group) == 1:
+                self._run_alone(group[0])
+                return
+
+            # Frames are built per request so a malformed request fails on its own
+            frames = []
+            for job in group:
+                try:
+                    frames.append((job, accounts_frame(job["accounts"][0], job["accounts"][1:])))
+                except Exception as e:
+                    job["error"] = e
+            if len(frames) == 1:
+                self._run_alone(frames[0][0])
+                return
+
+            try:
+                self._run_union(group[0]["grid"], frames)
+            except Exception:
+                # Keep errors with the request that caused them
+                for job, _ in frames:
+                    self._run_alone(job)
+        except Exception as e:
+            for job in group:
+                if "result" not in job:
+                    job.setdefault("error", e)
+        finally:
+            for job in group:
+                job["done"].set()
+
+    @staticmethod
+    def _run_alone(job):
+        try:
+            job["result"] = calculate_results(job["grid"], job["accounts"])
+        except Exception as e:
+            job["error"] = e
+
+    @staticmethod
+    def _run_union(grid_data, frames):
+        """One pipeline run over the union of accounts, then split back per request."""
+        accounts_df = pd.concat([df for _, df in frames], ignore_index=True)
+        v_edges, growth_edges, rate_matrix = parse_grid(grid_data)
+        v_idx, g_idx, mask = score_accounts(accounts_df, v_edges, growth_edges, rate_matrix)
+
+        results = []
+        start = 0
+        for job, df in frames:
+            part = slice(start, start + len(df))
+            start = part.stop
+            part_df = accounts_df.iloc[part].reset_index(drop=True)
+            results.append(
+                (summarize_rebates(part_df, v_idx[part], g_idx[part], mask[part], rate_matrix.shape), part_df)
+            )
+        for (job, _), result in zip(frames, results):
+            job["result"] = result
+
+_batcher = CalculateBatcher(app.config["CALCULATE_BATCH_WINDOW"])
 
 # --- Flask Routes ---
 
@@ -98,41 +296,27 @@ def index():
 
 @app.route('/calculate', methods=['POST'])
 def calculate():
+    """Total rebate and tier summary; ?include_rows=1 also streams the per-account table."""
     data = request.get_json()
     grid_data = data.get('grid')
     accounts_data = data.get('accounts')
 
     if not grid_data or not accounts_data:
         return jsonify({"error": "Grid and accounts data are required."}), 400
+    if (not isinstance(grid_data, list) or not isinstance(accounts_data, list)
+            or not all(isinstance(row, list) for row in accounts_data)
+            or not all(isinstance(col, str) for col in accounts_data[0])):
+        return jsonify({"error": "Grid and accounts must be lists of rows, with a header row of column names."}), 400
 
     try:
-        # Create DataFrame for accounts
-        accounts_df = pd.DataFrame(accounts_data[1:], columns=accounts_data[0])
-        
-        # Parse grid and get rates/bins
-        volume_bins, growth_bins, rebate_rates = parse_grid(grid_data)
-
-        # Assign tiers
-        accounts_df = assign_tiers_from_bins(accounts_df, volume_bins, growth_bins)
-
-        # Compute rebates
-        accounts_df["rebate"] = accounts_df.apply(lambda row: compute_rebate(row, rebate_rates), axis=1)
-        
-        # Prepare results
-        total_rebate = accounts_df["rebate"].sum()
-        
-        # Convert tiers to string for JSON serialization
-        accounts_df['volume_tier'] = accounts_df['volume_tier'].astype(str)
-        accounts_df['growth_tier'] = accounts_df['growth_tier'].astype(str)
-
-        summary = accounts_df.groupby(["volume_tier", "growth_tier"])["rebate"].agg(["count", "sum"]).reset_index()
-
-        results = {
-            "table": accounts_df.to_dict(orient='records'),
-            "total_rebate": total_rebate,
-            "summary": summary.to_dict(orient='records')
-        }
-        
+        if app.config["CALCULATE_BATCHING"]:
+            _batcher.window = app.config["CALCULATE_BATCH_WINDOW"]
+            results, accounts_df = _batcher.submit(grid_data, accounts_data)
+        else:
+            results, accounts_df = calculate_results(grid_data, accounts_data)
+
+        if request.args.get("include_rows") in ("1", "true"):
+            return Response(stream_with_context(stream_results(results, accounts_df)), mimetype="application/json")
         return jsonify(results)
 
     except Exception as e:
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request
+import numpy as np
+import orjson
+from flask import Flask, render_template, request
 
 from rebate_contract import (
     AccountPeriodData,
@@ -21,20 +25,73 @@ from rebate_contract import (
 app = Flask(__name__)
 DATA_FILE = Path(__file__).with_name("DummyDataGpot2.csv")
 _account_data: AccountPeriodData | None = None
+_account_data_lock = threading.Lock()
+
+# /optimize is a pure function of its inputs once the dataset is loaded, so
+# repeated submissions of the same grid are served from a small LRU cache
+app.config.setdefault("OPTIMIZE_CACHE_SIZE", 64)
+_optimize_cache: OrderedDict[tuple, dict] = OrderedDict()
+_optimize_cache_lock = threading.Lock()
 
 
 def get_account_data() -> AccountPeriodData:
+    """Shared, read-only dataset; every request builds its own ProgramConfig."""
     global _account_data
     if _account_data is None:
-        _account_data = AccountPeriodData.from_csv(DATA_FILE)
+        with _account_data_lock:
+            if _account_data is None:
+                _account_data = AccountPeriodData.from_csv(DATA_FILE)
     return _account_data
 
 
+# Parse the CSV at import so the first request does not pay for it
+get_account_data()
+
+
+def _json_response(payload, status: int = 200):
+    """Serialize with orjson; NumPy arrays and scalars are written natively."""
+    return app.response_class(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype="application/json",
+    )
+
+
+def _request_payload() -> dict:
+    try:
+        payload = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError as exc:
+        raise ValueError("Request body must be valid JSON.") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object.")
+    return payload
+
+
 def _number_list(payload: dict, key: str, default: tuple[float, ...]) -> tuple[float, ...]:
     value = payload.get(key, default)
     if not isinstance(value, (list, tuple)) or not value:
         raise ValueError(f"{key} must be a non-empty list.")
-    return tuple(float(item) for item in value)
+    # One C-level conversion for the whole list instead of float() per item
+    values = np.asarray(value, dtype=float)
+    if values.ndim != 1:
+        raise ValueError(f"{key} must be a flat list of numbers.")
+    return tuple(values.tolist())
+
+
+def _rate_value(value) -> float:
+    if isinstance(value, str) and value.strip().endswith("%"):
+        return float(value.strip()[:-1]) / 100.0
+    return float(value)
+
+
+def _rate_rows(payload: dict) -> list[list[float]]:
+    """Rates as floats; "x%" strings are accepted and converted once up front."""
+    rates = payload.get("rates")
+    if rates is None:
+        raise ValueError("rates is required.")
+    if not isinstance(rates, list) or not all(isinstance(row, list) for row in rates):
+        raise ValueError("rates must be a list of rows.")
+    return [[_rate_value(value) for value in row] for row in rates]
 
 
 def _optional_float(payload: dict, key: str) -> float | None:
@@ -83,6 +140,22 @@ def _scenarios_from_payload(payload: dict) -> ScenarioSet:
     )
 
 
+def _cache_get(key: tuple) -> dict | None:
+    with _optimize_cache_lock:
+        payload = _optimize_cache.get(key)
+        if payload is not None:
+            _optimize_cache.move_to_end(key)
+        return payload
+
+
+def _cache_put(key: tuple, payload: dict) -> None:
+    with _optimize_cache_lock:
+        _optimize_cache[key] = payload
+        _optimize_cache.move_to_end(key)
+        while len(_optimize_cache) > app.config["OPTIMIZE_CACHE_SIZE"]:
+            _optimize_cache.popitem(last=False)
+
+
 @app.get("/")
 def index():
     return render_template("index.html")
@@ -91,30 +164,37 @@ def index():
 @app.post("/optimize")
 def optimize():
     try:
-        payload = request.get_json(silent=False)
-        if not isinstance(payload, dict):
-            raise ValueError("Request body must be a JSON object.")
+        payload = _request_payload()
         data = get_account_data()
         user_config = _program_from_payload(payload)
         scenarios = _scenarios_from_payload(payload)
+        include_auto = bool(payload.get("include_auto_candidates", True))
+        key = (
+            user_config,
+            orjson.dumps([scenarios.low, scenarios.base, scenarios.high]),
+            include_auto,
+        )
+        cached = _cache_get(key)
+        if cached is not None:
+            return _json_response(cached)
         candidates = [user_config, legacy_program_config(user_config)]
-        if payload.get("include_auto_candidates", True):
+        if include_auto:
             candidates.extend(generate_threshold_candidates(data, user_config))
         result = optimize_program(data, candidates, scenarios)
-        return jsonify(result.to_dict())
+        response_payload = result.to_dict(native_arrays=True)
+        _cache_put(key, response_payload)
+        return _json_response(response_payload)
     except (TypeError, ValueError) as exc:
-        return jsonify({"error": str(exc)}), 400
+        return _json_response({"error": str(exc)}, 400)
     except Exception:
         app.logger.exception("Unexpected optimization failure")
-        return jsonify({"error": "Unexpected optimization failure."}), 500
+        return _json_response({"error": "Unexpected optimization failure."}, 500)
 
 
 @app.post("/calculate_static")
 def calculate_static():
     try:
-        payload = request.get_json(silent=False)
-        if not isinstance(payload, dict):
-            raise ValueError("Request body must be a JSON object.")
+        payload = _request_payload()
         config = _program_from_payload(
             {
                 **payload,
@@ -122,22 +202,20 @@ def calculate_static():
                 "min_revenue_share_per_cell": 0,
             }
         )
-        rates = payload.get("rates")
-        if rates is None:
-            raise ValueError("rates is required.")
+        rates = _rate_rows(payload)
         result = evaluate_actual_grid(get_account_data(), config, rates)
-        return jsonify(result)
+        return _json_response(result)
     except (TypeError, ValueError) as exc:
-        return jsonify({"error": str(exc)}), 400
+        return _json_response({"error": str(exc)}, 400)
     except Exception:
         app.logger.exception("Unexpected static calculation failure")
-        return jsonify({"error": "Unexpected static calculation failure."}), 500
+        return _json_response({"error": "Unexpected static calculation failure."}, 500)
 
 
 @app.get("/health")
 def health():
     data = get_account_data()
-    return jsonify({"status": "ok", "reconciliation": data.reconciliation()})
+    return _json_response({"status": "ok", "reconciliation": data.reconciliation()})
 
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ No causal response is learned from the observational rebate column.
 from __future__ import annotations
 
 from dataclasses import asdict, dataclass, field, replace
+from functools import cached_property
 from itertools import product
 from pathlib import Path
 from typing import Iterable, Literal, Sequence
@@ -23,6 +24,13 @@ from scipy.sparse import lil_matrix
 
 
 PayoutBasis = Literal["incremental", "all_revenue"]
+_SOURCE_COLUMNS = frozenset({"rfp_name", "rfp_group", "prevyr_rev", "curryr_rev"})
+
+
+def _read_only(values: Sequence[float]) -> np.ndarray:
+    edges = np.asarray(values, dtype=float)
+    edges.setflags(write=False)
+    return edges
 
 
 @dataclass(frozen=True)
@@ -53,14 +61,23 @@ class ProgramConfig:
         count = int(round((self.max_rate - self.min_rate) / self.rate_step))
         return np.round(self.min_rate + np.arange(count + 1) * self.rate_step, 10)
 
+    @cached_property
+    def volume_edges(self) -> np.ndarray:
+        """Volume milestones as a read-only float array for searchsorted."""
+        return _read_only(self.volume_milestones)
+
+    @cached_property
+    def growth_edges(self) -> np.ndarray:
+        """Growth milestones as a read-only float array for searchsorted."""
+        return _read_only(self.growth_milestones)
+
     def validate(self) -> None:
         if len(self.volume_milestones) < 2 or len(self.growth_milestones) < 2:
             raise ValueError("At least two volume and growth milestones are required.")
-        for label, values in (
-            ("volume", self.volume_milestones),
-            ("growth", self.growth_milestones),
+        for label, arr in (
+            ("volume", self.volume_edges),
+            ("growth", self.growth_edges),
         ):
-            arr = np.asarray(values, dtype=float)
             if not np.all(np.isfinite(arr)) or not np.all(np.diff(arr) > 0):
                 raise ValueError(f"{label.title()} milestones must be finite and strictly increasing.")
         if self.min_rate < 0 or self.max_rate <= self.min_rate:
@@ -127,22 +144,26 @@ class AccountPeriodData:
 
     @classmethod
     def from_csv(cls, path: str | Path) -> "AccountPeriodData":
-        return cls.from_frame(pd.read_csv(path))
+        # Only the identifier and revenue columns are parsed; a missing one is
+        # still reported by from_frame
+        return cls.from_frame(pd.read_csv(path, usecols=_SOURCE_COLUMNS.__contains__))
 
     @classmethod
     def from_frame(cls, source: pd.DataFrame) -> "AccountPeriodData":
-        required = {"rfp_name", "rfp_group", "prevyr_rev", "curryr_rev"}
-        missing = sorted(required - set(source.columns))
+        missing = sorted(_SOURCE_COLUMNS - set(source.columns))
         if missing:
             raise ValueError(f"Missing required columns: {', '.join(missing)}")
 
-        frame = source.copy()
+        # Narrow copy: only the identifier and revenue columns are used
+        frame = source.loc[
+            :, [column for column in source.columns if column in _SOURCE_COLUMNS]
+        ].copy()
         invalid_ids = frame[["rfp_name", "rfp_group"]].isna().any(axis=1)
         frame["baseline_revenue"] = pd.to_numeric(frame["prevyr_rev"], errors="coerce")
         frame["forecast_revenue"] = pd.to_numeric(frame["curryr_rev"], errors="coerce")
         invalid_revenue = frame[["baseline_revenue", "forecast_revenue"]].isna().any(axis=1)
 
-        valid = frame.loc[~invalid_ids & ~invalid_revenue].copy()
+        valid = frame.loc[~invalid_ids & ~invalid_revenue]
         accounts = (
             valid.groupby(["rfp_name", "rfp_group"], as_index=False, dropna=False)[
                 ["baseline_revenue", "forecast_revenue"]
@@ -150,12 +171,10 @@ class AccountPeriodData:
             .sum()
             .reset_index(drop=True)
         )
-        accounts["growth"] = np.full(len(accounts), np.nan)
-        positive_baseline = accounts["baseline_revenue"] > 0
-        accounts.loc[positive_baseline, "growth"] = (
-            accounts.loc[positive_baseline, "forecast_revenue"]
-            - accounts.loc[positive_baseline, "baseline_revenue"]
-        ) / accounts.loc[positive_baseline, "baseline_revenue"]
+        accounts["growth"] = _growth(
+            accounts["forecast_revenue"].to_numpy(dtype=float),
+            accounts["baseline_revenue"].to_numpy(dtype=float),
+        )
         return cls(
             accounts=accounts,
             source_rows=len(frame),
@@ -163,6 +182,26 @@ class AccountPeriodData:
             invalid_revenue_rows=int((invalid_revenue & ~invalid_ids).sum()),
         )
 
+    @cached_property
+    def baseline(self) -> np.ndarray:
+        """Read-only baseline revenue per account, computed once per dataset."""
+        return _read_only(self.accounts["baseline_revenue"].to_numpy(dtype=float, copy=True))
+
+    @cached_property
+    def forecast(self) -> np.ndarray:
+        """Read-only forecast revenue per account, computed once per dataset."""
+        return _read_only(self.accounts["forecast_revenue"].to_numpy(dtype=float, copy=True))
+
+    @cached_property
+    def growth(self) -> np.ndarray:
+        """Read-only forecast growth; NaN where the baseline is not positive."""
+        return _read_only(self.accounts["growth"].to_numpy(dtype=float, copy=True))
+
+    @cached_property
+    def no_program_revenue(self) -> float:
+        """Total forecast revenue with negative forecasts floored at zero."""
+        return float(np.maximum(self.forecast, 0.0).sum())
+
     def reconciliation(self) -> dict[str, int]:
         return {
             "source_rows": self.source_rows,
@@ -198,17 +237,24 @@ class OptimizationResult:
     candidate_assessments: list[CandidateAssessment] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
 
-    def to_dict(self) -> dict:
+    def to_dict(self, *, native_arrays: bool = False) -> dict:
+        """JSON-ready result.
+
+        With native_arrays=True the grids stay NumPy arrays for encoders that
+        serialize them directly (orjson.OPT_SERIALIZE_NUMPY), skipping the
+        per-cell Python float conversion.
+        """
+        convert = np.ascontiguousarray if native_arrays else np.ndarray.tolist
         return {
             "program": {
                 **asdict(self.config),
                 "volume_milestones": list(self.config.volume_milestones),
                 "growth_milestones": list(self.config.growth_milestones),
             },
-            "rates": self.rates.tolist(),
+            "rates": convert(self.rates),
             "scenarios": self.scenarios,
-            "cell_counts": self.cell_counts.astype(int).tolist(),
-            "cell_revenue": self.cell_revenue.tolist(),
+            "cell_counts": convert(self.cell_counts.astype(np.int64, copy=False)),
+            "cell_revenue": convert(self.cell_revenue),
             "exclusion_counts": self.exclusion_counts,
             "reconciliation": self.reconciliation,
             "constraint_checks": self.constraint_checks,
@@ -239,6 +285,8 @@ def evaluate_actual_grid(
     data: AccountPeriodData,
     config: ProgramConfig,
     rates: Sequence[Sequence[float]],
+    *,
+    block_rows: int = 1 << 16,
 ) -> dict[str, float | dict[str, int]]:
     """Apply a published grid to observed account-period results."""
 
@@ -247,28 +295,45 @@ def evaluate_actual_grid(
         raise ValueError(f"Rate grid must have shape {config.shape}.")
     if not np.all(np.isfinite(rate_grid)) or np.any(rate_grid < 0):
         raise ValueError("Rate grid values must be finite and non-negative.")
-
-    accounts = data.accounts
-    vi, gi, eligible, exclusions = assign_cells(accounts, config)
-    applied_rates = np.zeros(len(accounts))
-    applied_rates[eligible] = rate_grid[gi[eligible], vi[eligible]]
-    actual = accounts["forecast_revenue"].clip(lower=0).to_numpy(dtype=float)
-    baseline = accounts["baseline_revenue"].to_numpy(dtype=float)
-    payout_base = (
-        np.maximum(actual - baseline, 0.0)
-        if config.payout_basis == "incremental"
-        else actual
-    )
-    payouts = applied_rates * payout_base
-    eligible_revenue = float(actual[eligible].sum())
+    if block_rows < 1:
+        raise ValueError("block_rows must be at least 1.")
+
+    # Works on the cached column arrays only, one block of accounts at a time,
+    # so the per-account temporaries stay cache-sized however large the data
+    total_payout = 0.0
+    eligible_revenue = 0.0
+    exclusions: dict[str, int] = {}
+    for start in range(0, max(len(data.forecast), 1), block_rows):
+        block = slice(start, start + block_rows)
+        baseline = data.baseline[block]
+        forecast = data.forecast[block]
+        vi, gi, eligible, block_exclusions = _assign_arrays(
+            baseline, forecast, data.growth[block], config
+        )
+        for reason, count in block_exclusions.items():
+            exclusions[reason] = exclusions.get(reason, 0) + count
+        # Clamp the -1 "below milestone" codes to a valid cell and zero them out,
+        # instead of compressing every index array through the eligible mask
+        applied_rates = np.where(
+            eligible, rate_grid[np.maximum(gi, 0), np.maximum(vi, 0)], 0.0
+        )
+        actual = np.maximum(forecast, 0.0)
+        if config.payout_basis == "incremental":
+            payout_base = np.subtract(actual, baseline)
+            np.maximum(payout_base, 0.0, out=payout_base)
+        else:
+            payout_base = actual
+        # Fused multiply-accumulate; no per-account payout array is materialized
+        total_payout += float(np.dot(applied_rates, payout_base))
+        eligible_revenue += float(actual.sum(where=eligible))
     return {
-        "total_revenue": float(actual.sum()),
+        "total_revenue": data.no_program_revenue,
         "eligible_revenue": eligible_revenue,
-        "total_payout": float(payouts.sum()),
+        "total_payout": total_payout,
         "effective_rate": float(
-            payouts.sum() / eligible_revenue if eligible_revenue else 0.0
+            total_payout / eligible_revenue if eligible_revenue else 0.0
         ),
-        "eligible_accounts": int(eligible.sum()),
+        "eligible_accounts": exclusions["eligible"],
         "exclusion_counts": exclusions,
     }
 
@@ -346,15 +411,31 @@ def assign_cells(
 
     baseline = accounts["baseline_revenue"].to_numpy(dtype=float)
     revenue = accounts[revenue_column].to_numpy(dtype=float)
-    growth = np.full(len(accounts), np.nan)
+    return _assign_arrays(baseline, revenue, _growth(revenue, baseline), config)
+
+
+def _growth(revenue: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+    """Growth over baseline; NaN where the baseline is not positive."""
+    growth = np.full(len(revenue), np.nan)
     np.divide(
         revenue - baseline,
         baseline,
         out=growth,
         where=baseline > 0,
     )
-    volume_idx = np.searchsorted(config.volume_milestones, revenue, side="right") - 1
-    growth_idx = np.searchsorted(config.growth_milestones, growth, side="right") - 1
+    return growth
+
+
+def _assign_arrays(
+    baseline: np.ndarray,
+    revenue: np.ndarray,
+    growth: np.ndarray,
+    config: ProgramConfig,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, int]]:
+    """Array core of assign_cells for callers that already hold the columns."""
+
+    volume_idx = np.searchsorted(config.volume_edges, revenue, side="right") - 1
+    growth_idx = np.searchsorted(config.growth_edges, growth, side="right") - 1
 
     valid_baseline = np.isfinite(baseline) & (baseline > 0)
     valid_forecast = np.isfinite(revenue) & (revenue >= 0)
@@ -376,16 +457,15 @@ def assign_cells(
 
 def assess_candidate(data: AccountPeriodData, config: ProgramConfig) -> CandidateAssessment:
     config.validate()
-    accounts = data.accounts
-    vi, gi, eligible, _ = assign_cells(accounts, config)
+    forecast = data.forecast
+    vi, gi, eligible, _ = _assign_arrays(data.baseline, forecast, data.growth, config)
     rows, cols = config.shape
-    counts = np.zeros((rows, cols), dtype=int)
-    revenue = np.zeros((rows, cols), dtype=float)
-    forecast = accounts["forecast_revenue"].to_numpy(dtype=float)
-    for g, v in product(range(rows), range(cols)):
-        mask = eligible & (gi == g) & (vi == v)
-        counts[g, v] = int(mask.sum())
-        revenue[g, v] = float(forecast[mask].sum())
+    # One flat cell index per eligible account, then a single pass per statistic
+    cell = gi[eligible] * cols + vi[eligible]
+    counts = np.bincount(cell, minlength=rows * cols).reshape(rows, cols)
+    revenue = np.bincount(
+        cell, weights=forecast[eligible], minlength=rows * cols
+    ).reshape(rows, cols)
 
     reasons: list[str] = []
     total_eligible_revenue = revenue.sum()
@@ -423,7 +503,7 @@ def _payout(
 
 
 def _cell_options(
-    accounts: pd.DataFrame,
+    data: AccountPeriodData,
     config: ProgramConfig,
     scenarios: ScenarioSet,
     vi: np.ndarray,
@@ -431,33 +511,34 @@ def _cell_options(
     eligible: np.ndarray,
 ) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray], np.ndarray, np.ndarray]:
     rows, cols = config.shape
+    cells = rows * cols
     rates = config.allowed_rates
+    choices = len(rates)
     elasticities = scenarios.matrices(config.shape)
-    option_net = {
-        name: np.zeros((rows, cols, len(rates))) for name in elasticities
-    }
-    option_payout = {
-        name: np.zeros((rows, cols, len(rates))) for name in elasticities
-    }
-    counts = np.zeros((rows, cols), dtype=int)
-    cell_revenue = np.zeros((rows, cols), dtype=float)
 
-    forecast = accounts["forecast_revenue"].to_numpy(dtype=float)
-    baseline = accounts["baseline_revenue"].to_numpy(dtype=float)
-    for g, v in product(range(rows), range(cols)):
-        mask = eligible & (gi == g) & (vi == v)
-        cell_forecast = forecast[mask]
-        cell_baseline = baseline[mask]
-        counts[g, v] = int(mask.sum())
-        cell_revenue[g, v] = float(cell_forecast.sum())
-        for scenario_name, elasticity in elasticities.items():
-            for rate_index, rate in enumerate(rates):
-                projected = cell_forecast * (1 + elasticity[g, v] * rate)
-                payout = _payout(projected, cell_baseline, rate, config.payout_basis)
-                option_payout[scenario_name][g, v, rate_index] = payout.sum()
-                option_net[scenario_name][g, v, rate_index] = (
-                    projected - payout
-                ).sum()
+    # One bincount per (scenario, rate) over the eligible accounts' cell ids
+    # instead of a full-length mask per cell; temporaries stay O(accounts)
+    cell = gi[eligible] * cols + vi[eligible]
+    forecast = data.forecast[eligible]
+    baseline = data.baseline[eligible]
+    counts = np.bincount(cell, minlength=cells).reshape(rows, cols)
+    cell_revenue = np.bincount(cell, weights=forecast, minlength=cells).reshape(rows, cols)
+
+    option_net = {}
+    option_payout = {}
+    for scenario_name, elasticity in elasticities.items():
+        account_elasticity = elasticity.ravel()[cell]
+        net = np.empty((cells, choices))
+        payouts = np.empty((cells, choices))
+        for rate_index, rate in enumerate(rates):
+            projected = forecast * (1 + account_elasticity * rate)
+            payout = _payout(projected, baseline, rate, config.payout_basis)
+            payouts[:, rate_index] = np.bincount(cell, weights=payout, minlength=cells)
+            net[:, rate_index] = np.bincount(
+                cell, weights=projected - payout, minlength=cells
+            )
+        option_payout[scenario_name] = payouts.reshape(rows, cols, choices)
+        option_net[scenario_name] = net.reshape(rows, cols, choices)
     return option_net, option_payout, counts, cell_revenue
 
 
@@ -466,10 +547,11 @@ def _solve_rates(
     config: ProgramConfig,
     scenarios: ScenarioSet,
 ) -> tuple[np.ndarray, dict[str, dict[str, float]], np.ndarray, np.ndarray, dict[str, int]]:
-    accounts = data.accounts
-    vi, gi, eligible, exclusions = assign_cells(accounts, config)
+    vi, gi, eligible, exclusions = _assign_arrays(
+        data.baseline, data.forecast, data.growth, config
+    )
     option_net, option_payout, counts, cell_revenue = _cell_options(
-        accounts, config, scenarios, vi, gi, eligible
+        data, config, scenarios, vi, gi, eligible
     )
     rows, cols = config.shape
     rates = config.allowed_rates
@@ -507,10 +589,9 @@ def _solve_rates(
             coeff[var_index(g, v, k)] = option_payout["base"][g, v, k]
         constraints.append((coeff, -np.inf, config.budget))
 
-    fixed_forecast = float(
-        accounts.loc[~eligible & (accounts["forecast_revenue"] >= 0), "forecast_revenue"].sum()
-    )
-    no_program = float(accounts["forecast_revenue"].clip(lower=0).sum())
+    forecast = data.forecast
+    fixed_forecast = float(forecast.sum(where=~eligible & (forecast >= 0)))
+    no_program = data.no_program_revenue
     low_required_from_cells = no_program - fixed_forecast
     low_coeff = {}
     for g, v, k in product(range(rows), range(cols), range(choices)):
@@ -575,23 +656,21 @@ def _migration_stress(
     scenarios: ScenarioSet,
     rates: np.ndarray,
 ) -> dict[str, float | bool | str]:
-    accounts = data.accounts
-    vi, gi, eligible, _ = assign_cells(accounts, config)
-    original_cell = np.where(eligible, gi * config.shape[1] + vi, -1)
+    forecast = data.forecast
+    baseline = data.baseline
+    vi, gi, eligible, _ = _assign_arrays(baseline, forecast, data.growth, config)
+    # Cell ids fit comfortably in int32; the state arrays are hashed and
+    # compared every iteration, so the narrower dtype halves that traffic
+    original_cell = np.where(eligible, gi * config.shape[1] + vi, -1).astype(np.int32)
     state = original_cell.copy()
     seen: set[bytes] = set()
     elasticity = scenarios.matrices(config.shape)["base"]
-    forecast = accounts["forecast_revenue"].to_numpy(dtype=float)
-    baseline = accounts["baseline_revenue"].to_numpy(dtype=float)
 
     def state_metrics(cell_state: np.ndarray) -> tuple[np.ndarray, float]:
-        applied_rate = np.zeros(len(accounts))
-        applied_elasticity = np.zeros(len(accounts))
         active = cell_state >= 0
-        state_g = np.where(active, cell_state // config.shape[1], 0)
-        state_v = np.where(active, cell_state % config.shape[1], 0)
-        applied_rate[active] = rates[state_g[active], state_v[active]]
-        applied_elasticity[active] = elasticity[state_g[active], state_v[active]]
+        cell = np.maximum(cell_state, 0)
+        applied_rate = np.where(active, rates.ravel()[cell], 0.0)
+        applied_elasticity = np.where(active, elasticity.ravel()[cell], 0.0)
         projected = np.maximum(forecast, 0) * (1 + applied_elasticity * applied_rate)
         payout = _payout(projected, baseline, 1.0, config.payout_basis) * applied_rate
         return projected, float((projected - payout).sum())
@@ -609,13 +688,12 @@ def _migration_stress(
             }
         seen.add(key)
         projected, stable_net = state_metrics(state)
-        projected_frame = accounts.assign(projected_revenue=projected)
-        next_vi, next_gi, next_eligible, _ = assign_cells(
-            projected_frame, config, revenue_column="projected_revenue"
+        next_vi, next_gi, next_eligible, _ = _assign_arrays(
+            baseline, projected, _growth(projected, baseline), config
         )
         next_state = np.where(
             next_eligible, next_gi * config.shape[1] + next_vi, -1
-        )
+        ).astype(np.int32)
         if np.array_equal(next_state, state):
             original_active = original_cell >= 0
             migrated = (
@@ -125,7 +125,8 @@ document.addEventListener('DOMContentLoaded', () => {
         if (!gridData || !accountsData) return;
 
         try {
-            const response = await fetch('/calculate', {
+            // The results table needs the per-account rows, which are opt-in
+            const response = await fetch('/calculate?include_rows=1', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
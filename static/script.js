@@ -31,12 +31,15 @@ document.addEventListener('DOMContentLoaded', () => {
         };
     }
 
+    // Building a NumberFormat is far costlier than using one; the grids call money() per cell
+    const moneyFormat = new Intl.NumberFormat('en-US', {
+        style: 'currency',
+        currency: 'USD',
+        maximumFractionDigits: 0,
+    });
+
     function money(value) {
-        return new Intl.NumberFormat('en-US', {
-            style: 'currency',
-            currency: 'USD',
-            maximumFractionDigits: 0,
-        }).format(value);
+        return moneyFormat.format(value);
     }
 
     function percent(value, digits = 1) {
@@ -63,22 +66,28 @@ document.addEventListener('DOMContentLoaded', () => {
         panel.classList.remove('hidden');
     }
 
-    function renderGrid(data) {
-        const headers = milestoneLabels(data.program.volume_milestones, (value) => money(value));
-        const rowLabels = milestoneLabels(data.program.growth_milestones, (value) => percent(value, 0));
+    function gridLabels(program) {
+        return {
+            headers: milestoneLabels(program.volume_milestones, (value) => money(value)),
+            rowLabels: milestoneLabels(program.growth_milestones, (value) => percent(value, 0)),
+        };
+    }
+
+    function tableHead(headers) {
+        return `<tr><th>Growth \\ Volume</th>${headers.map((h) => `<th>${h}</th>`).join('')}</tr>`;
+    }
+
+    function renderGrid(data, { headers, rowLabels }) {
         const head = $('#results-table thead');
         const body = $('#results-table tbody');
-        head.innerHTML = `<tr><th>Growth \\ Volume</th>${headers.map((h) => `<th>${h}</th>`).join('')}</tr>`;
+        head.innerHTML = tableHead(headers);
         body.innerHTML = data.rates.map((row, rowIndex) => (
             `<tr><th>${rowLabels[rowIndex]}</th>${row.map((rate) => `<td class="rate-cell">${percent(rate, 0)}</td>`).join('')}</tr>`
         )).join('');
     }
 
-    function renderCoverage(data) {
-        const headers = milestoneLabels(data.program.volume_milestones, (value) => money(value));
-        const rowLabels = milestoneLabels(data.program.growth_milestones, (value) => percent(value, 0));
-        $('#coverage-table thead').innerHTML =
-            `<tr><th>Growth \\ Volume</th>${headers.map((h) => `<th>${h}</th>`).join('')}</tr>`;
+    function renderCoverage(data, { headers, rowLabels }) {
+        $('#coverage-table thead').innerHTML = tableHead(headers);
         $('#coverage-table tbody').innerHTML = data.cell_counts.map((row, g) => (
             `<tr><th>${rowLabels[g]}</th>${row.map((count, v) => (
                 `<td><strong>${count.toLocaleString()} accounts</strong><br><span class="muted">${money(data.cell_revenue[g][v])}</span></td>`
@@ -142,8 +151,10 @@ document.addEventListener('DOMContentLoaded', () => {
             `${percent(data.migration.migrated_share)} moved · ${percent(data.migration.net_impact_share || 0)} net impact`;
         $('#contract-list').innerHTML = data.contract.map((line) => `<li>${line}</li>`).join('');
         showMessage(warningPanel, data.warnings);
-        renderGrid(data);
-        renderCoverage(data);
+        // Both tables share the same milestone labels; format them once
+        const labels = gridLabels(data.program);
+        renderGrid(data, labels);
+        renderCoverage(data, labels);
         renderScenarios(data);
         renderCandidates(data);
         renderReconciliation(data);
@@ -188,8 +199,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const growth = parseNumberList($('#growth-milestones').value, 100);
         const volumeLabels = milestoneLabels(volume, (value) => money(value));
         const growthLabels = milestoneLabels(growth, (value) => percent(value, 0));
-        $('#input-grid-table thead').innerHTML =
-            `<tr><th>Growth \\ Volume</th>${volumeLabels.map((label) => `<th>${label}</th>`).join('')}</tr>`;
+        $('#input-grid-table thead').innerHTML = tableHead(volumeLabels);
         $('#input-grid-table tbody').innerHTML = growthLabels.map((label, g) => (
             `<tr><th>${label}</th>${volume.map((_, v) => (
                 `<td><input class="rate-input" type="number" min="0" max="100" step="1" value="0" data-g="${g}" data-v="${v}" aria-label="${label}, ${volumeLabels[v]} rebate percent"></td>`
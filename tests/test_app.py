@@ -0,0 +1,170 @@
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import app
+
+
+GRID = [
+    ["Volume", "0", "0.08", "0.15"],
+    ["0-1000", "0", "1%", "2"],
+    ["1000+", "0", "0.03", "0.04"],
+]
+
+ACCOUNTS = [
+    ["rfp_group", "curryr_rev", "prevyr_rev"],
+    ["a", "500", "400"],    # V1, growth 0.25 -> G3 at 2%
+    ["b", "2000", "1900"],  # V2, growth ~0.05 -> G1 at 0%
+    ["c", "1500", "1350"],  # V2, growth ~0.11 -> G2 at 3%
+    ["d", "-5", "10"],      # below the first volume bin
+]
+
+
+class CalculateTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app.app.config.update(TESTING=True)
+        cls.client = app.app.test_client()
+
+    def test_parse_grid_builds_rate_matrix(self):
+        v_edges, growth_edges, rate_matrix = app.parse_grid(GRID)
+        self.assertEqual(v_edges.dtype, np.float64)
+        self.assertEqual(v_edges.tolist(), [0.0, 1000.0, float("inf")])
+        self.assertEqual(growth_edges.tolist(), [0.0, 0.08, 0.15, float("inf")])
+        self.assertEqual(rate_matrix.tolist(), [[0.0, 0.01, 0.02], [0.0, 0.03, 0.04]])
+
+    def test_calculate_gathers_rates_by_tier(self):
+        response = self.client.post("/calculate?include_rows=1", json={"grid": GRID, "accounts": ACCOUNTS})
+        self.assertEqual(response.status_code, 200, response.get_json())
+        payload = response.get_json()
+        rebates = [row["rebate"] for row in payload["table"]]
+        self.assertEqual(rebates, [10.0, 0.0, 45.0, 0.0])
+        self.assertAlmostEqual(payload["total_rebate"], 55.0)
+        summary = {(row["volume_tier"], row["growth_tier"]): row for row in payload["summary"]}
+        self.assertEqual(summary[("V2", "G2")]["count"], 1)
+        self.assertAlmostEqual(summary[("V2", "G2")]["sum"], 45.0)
+
+    def test_rows_are_only_returned_on_request(self):
+        payload = self.client.post("/calculate", json={"grid": GRID, "accounts": ACCOUNTS}).get_json()
+        self.assertNotIn("table", payload)
+        self.assertAlmostEqual(payload["total_rebate"], 55.0)
+
+        many = [ACCOUNTS[0]] + ACCOUNTS[1:] * 1500
+        response = self.client.post("/calculate?include_rows=1", json={"grid": GRID, "accounts": many})
+        payload = response.get_json()
+        self.assertEqual(len(payload["table"]), 6000)
+        self.assertEqual(payload["table"][4]["rebate"], 10.0)
+        self.assertIsNone(payload["table"][3]["volume_tier"])
+        self.assertAlmostEqual(payload["total_rebate"], 55.0 * 1500)
+
+    def test_zero_or_missing_prior_revenue_counts_as_zero_growth(self):
+        accounts = [["curryr_rev", "prevyr_rev"], ["2000", "0"], ["2000", ""], ["2000", "1000"]]
+        response = self.client.post("/calculate?include_rows=1", json={"grid": GRID, "accounts": accounts})
+        self.assertEqual(response.status_code, 200, response.get_json())
+        table = response.get_json()["table"]
+        self.assertEqual([row["growth"] for row in table], [0.0, 0.0, 1.0])
+        self.assertEqual([row["growth_tier"] for row in table], ["G1", "G1", "G3"])
+        self.assertEqual([row["rebate"] for row in table], [0.0, 0.0, 80.0])
+
+    def test_batched_requests_match_unbatched_results(self):
+        other_grid = [row[:3] for row in GRID]
+        requests = [
+            (GRID, ACCOUNTS),
+            (GRID, [ACCOUNTS[0]] + ACCOUNTS[3:]),
+            (GRID, ACCOUNTS[:2]),
+            (other_grid, ACCOUNTS),
+        ]
+        expected = [
+            self.client.post("/calculate?include_rows=1", json={"grid": g, "accounts": a}).get_json()
+            for g, a in requests
+        ]
+
+        responses = [None] * len(requests)
+
+        def post(i):
+            grid, accounts = requests[i]
+            client = app.app.test_client()
+            response = client.post("/calculate?include_rows=1", json={"grid": grid, "accounts": accounts})
+            responses[i] = (response.status_code, response.get_json())
+
+        app.app.config.update(CALCULATE_BATCHING=True, CALCULATE_BATCH_WINDOW=0.05)
+        try:
+            threads = [threading.Thread(target=post, args=(i,)) for i in range(len(requests))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            app.app.config.update(CALCULATE_BATCHING=False)
+
+        for (status, got), want in zip(responses, expected):
+            self.assertEqual(status, 200, got)
+            self.assertEqual([row["rebate"] for row in got["table"]], [row["rebate"] for row in want["table"]])
+            self.assertAlmostEqual(got["total_rebate"], want["total_rebate"])
+            self.assertEqual(got["summary"], want["summary"])
+
+    def _job(self, accounts, grid=GRID):
+        return {"grid": grid, "accounts": accounts, "done": threading.Event()}
+
+    def test_batch_group_is_coalesced_and_keeps_errors_per_request(self):
+        good = [self._job(ACCOUNTS), self._job([ACCOUNTS[0]] + ACCOUNTS[3:])]
+        bad = self._job([ACCOUNTS[0], ["e", "1", "2", "extra"]])
+        with mock.patch.object(
+            app.CalculateBatcher, "_run_union", wraps=app.CalculateBatcher._run_union
+        ) as union:
+            app._batcher._run_group(good + [bad])
+        union.assert_called_once()
+        self.assertTrue(all(job["done"].is_set() for job in good + [bad]))
+        self.assertIn("error", bad)
+        for job in good:
+            self.assertNotIn("error", job)
+            expected, _ = app.calculate_results(GRID, job["accounts"])
+            self.assertEqual(job["result"][0], expected)
+
+    def test_failed_union_run_falls_back_to_each_request(self):
+        jobs = [self._job(ACCOUNTS), self._job(ACCOUNTS[:2])]
+        with mock.patch.object(app.CalculateBatcher, "_run_union", side_effect=RuntimeError("boom")):
+            app._batcher._run_group(jobs)
+        for job in jobs:
+            self.assertNotIn("error", job)
+            self.assertEqual(job["result"][0], app.calculate_results(GRID, job["accounts"])[0])
+
+    def test_batching_survives_malformed_requests(self):
+        app.app.config.update(CALCULATE_BATCHING=True, CALCULATE_BATCH_WINDOW=0.01)
+        try:
+            response = self.client.post("/calculate", json={"grid": GRID, "accounts": [5, [1]]})
+            self.assertEqual(response.status_code, 400)
+
+            # A job the worker cannot even group is failed, not left waiting
+            outcome = {}
+            thread = threading.Thread(
+                target=lambda: outcome.setdefault("error", self._submit_error({1}, ACCOUNTS))
+            )
+            thread.start()
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+            self.assertIsNotNone(outcome["error"])
+
+            response = self.client.post("/calculate", json={"grid": GRID, "accounts": ACCOUNTS})
+            self.assertEqual(response.status_code, 200, response.get_json())
+            self.assertAlmostEqual(response.get_json()["total_rebate"], 55.0)
+        finally:
+            app.app.config.update(CALCULATE_BATCHING=False)
+
+    @staticmethod
+    def _submit_error(grid, accounts):
+        try:
+            app._batcher.submit(grid, accounts)
+        except Exception as e:
+            return e
+        return None
+
+    def test_missing_inputs_return_400(self):
+        response = self.client.post("/calculate", json={"grid": GRID})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import threading
 import unittest
+from unittest import mock
 
 import optimized_app
 
@@ -34,6 +36,20 @@ class OptimizedAppTests(unittest.TestCase):
         self.assertFalse(rejected["user_grid"]["accepted"])
         self.assertIn("legacy_current_grid", rejected)
 
+    def test_repeated_optimize_requests_are_served_from_cache(self):
+        optimized_app._optimize_cache.clear()
+        body = {"scenarios": {"low": 0.5, "base": 1.0, "high": 2.5}}
+        with mock.patch.object(
+            optimized_app, "optimize_program", wraps=optimized_app.optimize_program
+        ) as solver:
+            first = self.client.post("/optimize", json=body)
+            second = self.client.post("/optimize", json=body)
+            third = self.client.post("/optimize", json={**body, "scenarios": {"low": 0.5, "base": 1.5, "high": 2.5}})
+        self.assertEqual(first.status_code, 200, first.get_json())
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(third.status_code, 200, third.get_json())
+        self.assertEqual(solver.call_count, 2)
+
     def test_invalid_scenario_order_returns_400(self):
         response = self.client.post(
             "/optimize",
@@ -42,6 +58,13 @@ class OptimizedAppTests(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("low <= base <= high", response.get_json()["error"])
 
+    def test_malformed_json_returns_400(self):
+        response = self.client.post(
+            "/optimize", data="{not json", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("valid JSON", response.get_json()["error"])
+
     def test_static_calculator_validates_shape(self):
         response = self.client.post(
             "/calculate_static",
@@ -54,6 +77,43 @@ class OptimizedAppTests(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("shape", response.get_json()["error"])
 
+    def test_static_calculator_accepts_percent_strings(self):
+        payload = {
+            "volume_milestones": [6500, 25000, 50000],
+            "growth_milestones": [0.06, 0.10, 0.15, 0.20],
+        }
+        numeric = [[0.01, 0.02, 0.03], [0.02, 0.03, 0.04], [0.03, 0.04, 0.05], [0.04, 0.05, 0.06]]
+        strings = [[f"{rate * 100:.0f}%" for rate in row] for row in numeric]
+        strings[0][0] = "0.01"
+        expected = self.client.post("/calculate_static", json={**payload, "rates": numeric})
+        response = self.client.post("/calculate_static", json={**payload, "rates": strings})
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertAlmostEqual(response.get_json()["total_payout"], expected.get_json()["total_payout"])
+
+    def test_concurrent_requests_share_the_dataset(self):
+        payload = {
+            "volume_milestones": [6500, 25000, 50000],
+            "growth_milestones": [0.06, 0.10, 0.15, 0.20],
+        }
+        grids = [[[0.01 * (g + v + k) for v in range(3)] for g in range(4)] for k in range(1, 5)]
+        expected = [
+            self.client.post("/calculate_static", json={**payload, "rates": rates}).get_json()
+            for rates in grids
+        ]
+        results = [None] * len(grids)
+
+        def post(index):
+            client = optimized_app.app.test_client()
+            response = client.post("/calculate_static", json={**payload, "rates": grids[index]})
+            results[index] = response.get_json()
+
+        threads = [threading.Thread(target=post, args=(index,)) for index in range(len(grids))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
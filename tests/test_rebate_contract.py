@@ -4,6 +4,7 @@ from dataclasses import replace
 from pathlib import Path
 
 import numpy as np
+import orjson
 import pandas as pd
 
 import rebate_contract as rc
@@ -42,6 +43,14 @@ class AccountPreparationTests(unittest.TestCase):
         self.assertEqual(account.forecast_revenue, 120)
         self.assertAlmostEqual(account.growth, 0.2)
 
+    def test_cached_columns_are_read_only_and_match_accounts(self):
+        data = synthetic_data()
+        np.testing.assert_array_equal(data.forecast, [120, 220, 150, 300])
+        np.testing.assert_allclose(data.growth, data.accounts["growth"])
+        self.assertIs(data.baseline, data.baseline)
+        with self.assertRaises(ValueError):
+            data.baseline[0] = 0
+
     def test_missing_columns_are_actionable(self):
         with self.assertRaisesRegex(ValueError, "Missing required columns"):
             rc.AccountPeriodData.from_frame(pd.DataFrame({"curryr_rev": [1]}))
@@ -81,6 +90,14 @@ class ContractRuleTests(unittest.TestCase):
         self.assertAlmostEqual(result["total_payout"], expected)
         self.assertEqual(result["eligible_accounts"], 4)
 
+    def test_blockwise_evaluation_matches_single_pass(self):
+        rates = [[0.01, 0.02], [0.02, 0.03]]
+        whole = rc.evaluate_actual_grid(self.data, self.config, rates)
+        blocked = rc.evaluate_actual_grid(self.data, self.config, rates, block_rows=3)
+        self.assertEqual(blocked["exclusion_counts"], whole["exclusion_counts"])
+        self.assertAlmostEqual(blocked["total_payout"], whole["total_payout"])
+        self.assertAlmostEqual(blocked["eligible_revenue"], whole["eligible_revenue"])
+
     def test_all_revenue_basis_is_available_for_comparison(self):
         config = replace(self.config, payout_basis="all_revenue")
         result = rc.evaluate_actual_grid(self.data, config, [[0.01, 0.02], [0.02, 0.03]])
@@ -149,6 +166,15 @@ class OptimizerTests(unittest.TestCase):
         self.assertAlmostEqual(result.scenarios["base"]["net_revenue"], exhaustive_net)
         self.assertTrue(all(result.constraint_checks.values()))
 
+    def test_native_array_payload_serializes_like_plain_payload(self):
+        result = rc.optimize_program(self.data, [self.config], self.scenarios)
+        native = result.to_dict(native_arrays=True)
+        self.assertIsInstance(native["rates"], np.ndarray)
+        self.assertEqual(
+            orjson.loads(orjson.dumps(native, option=orjson.OPT_SERIALIZE_NUMPY)),
+            orjson.loads(orjson.dumps(result.to_dict())),
+        )
+
     def test_sparse_candidate_is_rejected_with_cell_reason(self):
         sparse = replace(self.config, min_accounts_per_cell=2)
         assessment = rc.assess_candidate(self.data, sparse)